@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['rumps', 'Quartz', 'Quartz.CoreGraphics'],
+    hiddenimports=['rumps'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -5,15 +5,21 @@ A menu bar app for focus and productivity.
 """
 
 import rumps
+import objc
 import threading
+import queue
 import time
-import random
+import math
 import os
 import sys
-import plistlib
+import subprocess
+import functools
+import ctypes
+import logging
 from pathlib import Path
 from enum import Enum
-from Quartz.CoreGraphics import CGEventSourceSecondsSinceLastEventType, kCGEventSourceStateCombinedSessionState
+from AppKit import NSEventTrackingRunLoopMode
+from Foundation import NSRunLoop, NSRunLoopCommonModes
 
 
 APP_NAME = "Pomodoro"
@@ -21,7 +27,18 @@ APP_VERSION = "1.1.0"
 APP_AUTHOR = "Saurabh Misra"
 BUNDLE_ID = "com.saurabhmisra.pomodoro"
 
+# Bind the CoreGraphics idle query directly, bypassing the PyObjC bridge
+_AS = ctypes.CDLL("/System/Library/Frameworks/ApplicationServices.framework/ApplicationServices")
+_AS.CGEventSourceSecondsSinceLastEventType.restype = ctypes.c_double
+_AS.CGEventSourceSecondsSinceLastEventType.argtypes = [ctypes.c_int32, ctypes.c_uint32]
+kCGEventSourceStateCombinedSessionState = 0
+kCGAnyInputEventType = 0xFFFFFFFF
 
+# Cached LaunchAgent state; this process is the only writer of the plist
+_autostart_cache = None
+
+
+@functools.lru_cache(maxsize=1)
 def get_launch_agent_path():
     """Get the path to the LaunchAgent plist file."""
     return Path.home() / "Library" / "LaunchAgents" / f"{BUNDLE_ID}.plist"
@@ -39,11 +56,17 @@ def get_app_executable():
 
 def is_autostart_enabled():
     """Check if auto-start on login is enabled."""
-    return get_launch_agent_path().exists()
+    global _autostart_cache
+    if _autostart_cache is None:
+        _autostart_cache = get_launch_agent_path().exists()
+    return _autostart_cache
 
 
 def enable_autostart():
     """Enable auto-start on login by creating a LaunchAgent."""
+    global _autostart_cache
+    import plistlib
+
     launch_agents_dir = Path.home() / "Library" / "LaunchAgents"
     launch_agents_dir.mkdir(parents=True, exist_ok=True)
 
@@ -66,20 +89,32 @@ def enable_autostart():
     }
 
     plist_path = get_launch_agent_path()
-    with open(plist_path, "wb") as f:
-        plistlib.dump(plist_content, f)
+    plist_path.write_bytes(plistlib.dumps(plist_content))
 
     # Load the agent
-    os.system(f"launchctl load {plist_path}")
+    subprocess.run(
+        ["launchctl", "load", str(plist_path)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    _autostart_cache = True
 
 
 def disable_autostart():
     """Disable auto-start on login by removing the LaunchAgent."""
+    global _autostart_cache
     plist_path = get_launch_agent_path()
     if plist_path.exists():
         # Unload the agent first
-        os.system(f"launchctl unload {plist_path}")
+        subprocess.run(
+            ["launchctl", "unload", str(plist_path)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
         plist_path.unlink()
+    _autostart_cache = False
 
 
 class TimerState(Enum):
@@ -91,7 +126,7 @@ class TimerState(Enum):
 
 
 # Inspirational messages about focus
-INSPIRATIONAL_MESSAGES = [
+INSPIRATIONAL_MESSAGES = tuple(sys.intern(m) for m in (
     "Deep work is the superpower of the 21st century. - Cal Newport",
     "Focus is saying no to 1,000 other things. - Steve Jobs",
     "The successful warrior is the average man with laser-like focus. - Bruce Lee",
@@ -107,7 +142,7 @@ INSPIRATIONAL_MESSAGES = [
     "Focus is a matter of deciding what things you're not going to do. - John Carmack",
     "Multitasking is the enemy of focus and excellence.",
     "25 minutes of deep focus beats 2 hours of scattered attention.",
-]
+))
 
 
 class PomodoroApp(rumps.App):
@@ -119,14 +154,45 @@ class PomodoroApp(rumps.App):
         self.short_rest_duration = 5 * 60
         self.long_rest_duration = 15 * 60
         self.sessions_until_long_rest = 4
+        self._focus_minutes = self.focus_duration // 60
+        self._short_rest_minutes = self.short_rest_duration // 60
+        self._long_rest_minutes = self.long_rest_duration // 60
+
+        # Preformatted MM:SS strings for every second a session can show
+        self._mmss = tuple(
+            f"{s // 60:02d}:{s % 60:02d}"
+            for s in range(max(self.focus_duration, self.short_rest_duration, self.long_rest_duration) + 1)
+        )
+
+        # Notification bodies, rendered once rather than in the menu callbacks
+        self._focus_bodies = tuple(
+            f"{self._focus_minutes} minutes of deep work. {m}" for m in INSPIRATIONAL_MESSAGES
+        )
+        self._short_rest_body = f"Take {self._short_rest_minutes} minutes to relax. You've earned it!"
+        self._long_rest_body = f"Take {self._long_rest_minutes} minutes to relax. You've earned it!"
 
         # State
         self.state = TimerState.IDLE
-        self.time_remaining = 0
+        self._deadline = 0.0
         self.completed_sessions = 0
         self.sessions_today = 0
-        self.timer_thread = None
-        self.running = False
+        self._last_title = None
+        self._msg_idx = 0
+
+        # Timers run on the main runloop, so callbacks may update the UI directly
+        self._tick_timer = rumps.Timer(self._on_tick, 1)
+        self._idle_timer = rumps.Timer(self._poll_idle, 1)
+        self._poll_interval = 1
+        self._skip_next_poll = False
+        self._paused_remaining = None
+
+        # Pause the countdown across system sleep
+        rumps.events.on_sleep.register(self._on_sleep)
+        rumps.events.on_wake.register(self._on_wake)
+
+        # Notifications are posted in order by a single background worker
+        self._notifications = queue.Queue()
+        threading.Thread(target=self._notification_worker, daemon=True).start()
 
         # Build menu
         self.start_button = rumps.MenuItem("Start Focus", callback=self.start_focus)
@@ -140,9 +206,9 @@ class PomodoroApp(rumps.App):
 
         # Settings submenu
         self.settings_menu = rumps.MenuItem("Settings")
-        self.focus_setting = rumps.MenuItem(f"Focus: {self.focus_duration // 60} min")
-        self.short_rest_setting = rumps.MenuItem(f"Short Rest: {self.short_rest_duration // 60} min")
-        self.long_rest_setting = rumps.MenuItem(f"Long Rest: {self.long_rest_duration // 60} min")
+        self.focus_setting = rumps.MenuItem(f"Focus: {self._focus_minutes} min")
+        self.short_rest_setting = rumps.MenuItem(f"Short Rest: {self._short_rest_minutes} min")
+        self.long_rest_setting = rumps.MenuItem(f"Long Rest: {self._long_rest_minutes} min")
 
         # Auto-start toggle
         self.autostart_item = rumps.MenuItem(
@@ -183,104 +249,125 @@ class PomodoroApp(rumps.App):
             rumps.MenuItem("Quit", callback=self.quit_app),
         ]
 
+        # Per-state (title, shows countdown, skip title, start/skip/stop callbacks)
+        self._state_table = {
+            TimerState.IDLE: ("🍅 Ready", False, "Skip to Rest", (self.start_focus, None, None)),
+            TimerState.FOCUS: ("🍅", True, "Skip to Rest", (None, self.skip_to_rest, self.stop_timer)),
+            TimerState.SHORT_REST: ("☕", True, "Skip to Focus", (None, self.skip_to_focus, self.stop_timer)),
+            TimerState.LONG_REST: ("☕", True, "Skip to Focus", (None, self.skip_to_focus, self.stop_timer)),
+            TimerState.WAITING_FOR_USER: ("🍅 Waiting...", False, "Skip to Rest", (self.start_focus, None, self.stop_timer)),
+        }
+
+    def _start_timer(self, timer):
+        """Start a rumps.Timer so it also fires while the status menu is open."""
+        timer.start()
+        # rumps only schedules in the default mode, which pauses during menu tracking
+        NSRunLoop.currentRunLoop().addTimer_forMode_(timer._nstimer, NSRunLoopCommonModes)
+
     def get_idle_time(self):
-        """Get system idle time in seconds using Quartz."""
-        return CGEventSourceSecondsSinceLastEventType(
+        """Get system idle time in seconds using CoreGraphics."""
+        return _AS.CGEventSourceSecondsSinceLastEventType(
             kCGEventSourceStateCombinedSessionState,
-            0xFFFFFFFF  # All event types
+            kCGAnyInputEventType
         )
 
     def format_time(self, seconds):
         """Format seconds as MM:SS."""
-        mins, secs = divmod(int(seconds), 60)
-        return f"{mins:02d}:{secs:02d}"
-
-    def update_title(self):
-        """Update menu bar title with current state and time."""
-        if self.state == TimerState.IDLE:
-            self.title = "🍅 Ready"
-        elif self.state == TimerState.FOCUS:
-            self.title = f"🍅 {self.format_time(self.time_remaining)}"
-        elif self.state in (TimerState.SHORT_REST, TimerState.LONG_REST):
-            self.title = f"☕ {self.format_time(self.time_remaining)}"
-        elif self.state == TimerState.WAITING_FOR_USER:
-            self.title = "🍅 Waiting..."
-
-    def update_menu_state(self):
-        """Update menu items based on current state."""
-        if self.state == TimerState.IDLE:
-            self.start_button.set_callback(self.start_focus)
-            self.skip_button.title = "Skip to Rest"
-            self.skip_button.set_callback(None)
-            self.stop_button.set_callback(None)
-        elif self.state == TimerState.FOCUS:
-            self.start_button.set_callback(None)
-            self.skip_button.title = "Skip to Rest"
-            self.skip_button.set_callback(self.skip_to_rest)
-            self.stop_button.set_callback(self.stop_timer)
-        elif self.state in (TimerState.SHORT_REST, TimerState.LONG_REST):
-            self.start_button.set_callback(None)
-            self.skip_button.title = "Skip to Focus"
-            self.skip_button.set_callback(self.skip_to_focus)
-            self.stop_button.set_callback(self.stop_timer)
-        elif self.state == TimerState.WAITING_FOR_USER:
-            self.start_button.set_callback(self.start_focus)
-            self.skip_button.title = "Skip to Rest"
-            self.skip_button.set_callback(None)
-            self.stop_button.set_callback(self.stop_timer)
-
+        return self._mmss[int(seconds)]
+
+    def update_title(self, remaining=None):
+        """Update menu bar title with current state and time (derived from the deadline if not given)."""
+        prefix, shows_time = self._state_table[self.state][:2]
+        if shows_time:
+            if remaining is None:
+                remaining = max(0, int(math.ceil(self._deadline - time.monotonic())))
+            new_title = f"{prefix} {self.format_time(remaining)}"
+        else:
+            new_title = prefix
+
+        # Only touch the status item when the visible text actually changes
+        if new_title != self._last_title:
+            self.title = new_title
+            self._last_title = new_title
+
+    def _apply_state_wiring(self):
+        """Update menu item callbacks for the current state; call on transitions only."""
+        _, _, skip_title, callbacks = self._state_table[self.state]
+        self.skip_button.title = skip_title
+        for item, callback in zip((self.start_button, self.skip_button, self.stop_button), callbacks):
+            item.set_callback(callback)
+
+    def _refresh_stats(self):
+        """Update the session counter; call only when sessions_today changes."""
         self.stats_item.title = f"Sessions today: {self.sessions_today}"
 
-    def get_random_message(self):
-        """Get a random inspirational message."""
-        return random.choice(INSPIRATIONAL_MESSAGES)
+    def _next_message_index(self):
+        """Advance to a random message index, never the same one twice in a row."""
+        # Step 1-8 places through the list; the clock supplies the randomness
+        self._msg_idx = (self._msg_idx + 1 + (time.monotonic_ns() & 7)) % len(INSPIRATIONAL_MESSAGES)
+        return self._msg_idx
 
     def notify(self, title, message, sound=True):
-        """Send a notification."""
-        rumps.notification(
-            title=title,
-            subtitle="",
-            message=message,
-            sound=sound
-        )
+        """Send a notification without blocking the calling menu callback."""
+        self._notifications.put((title, message, sound))
+
+    def _notification_worker(self):
+        """Post queued notifications one at a time, in the order they were sent."""
+        while True:
+            title, message, sound = self._notifications.get()
+            # This thread never exits, so drain autoreleased objects per post
+            with objc.autorelease_pool():
+                try:
+                    rumps.notification(
+                        title=title,
+                        subtitle="",
+                        message=message,
+                        sound=sound
+                    )
+                except Exception:
+                    # Keep the worker alive so later notifications still go out
+                    logging.exception("Failed to post notification %r", title)
 
     def start_focus(self, _=None):
         """Start a focus session."""
         self.state = TimerState.FOCUS
-        self.time_remaining = self.focus_duration
-        self.running = True
-        self.update_title()
-        self.update_menu_state()
+        self._deadline = time.monotonic() + self.focus_duration
+        self._idle_timer.stop()
+        # Restart so the first tick lines up with the new deadline
+        self._tick_timer.stop()
+        self._start_timer(self._tick_timer)
+        self.update_title(self.focus_duration)
+        self._apply_state_wiring()
 
         self.notify(
             "Focus Time! 🎯",
-            f"{self.focus_duration // 60} minutes of deep work. {self.get_random_message()}"
+            self._focus_bodies[self._next_message_index()]
         )
 
-        if self.timer_thread is None or not self.timer_thread.is_alive():
-            self.timer_thread = threading.Thread(target=self.timer_loop, daemon=True)
-            self.timer_thread.start()
-
     def start_rest(self, is_long=False):
         """Start a rest period."""
         if is_long:
             self.state = TimerState.LONG_REST
-            self.time_remaining = self.long_rest_duration
+            duration = self.long_rest_duration
             rest_type = "Long Break"
-            duration = self.long_rest_duration // 60
+            body = self._long_rest_body
         else:
             self.state = TimerState.SHORT_REST
-            self.time_remaining = self.short_rest_duration
+            duration = self.short_rest_duration
             rest_type = "Short Break"
-            duration = self.short_rest_duration // 60
+            body = self._short_rest_body
 
-        self.running = True
-        self.update_title()
-        self.update_menu_state()
+        self._deadline = time.monotonic() + duration
+        self._idle_timer.stop()
+        # Restart so the first tick lines up with the new deadline
+        self._tick_timer.stop()
+        self._start_timer(self._tick_timer)
+        self.update_title(duration)
+        self._apply_state_wiring()
 
         self.notify(
             f"{rest_type}! ☕",
-            f"Take {duration} minutes to relax. You've earned it!"
+            body
         )
 
     def skip_to_rest(self, _=None):
@@ -296,59 +383,102 @@ class PomodoroApp(rumps.App):
 
     def stop_timer(self, _=None):
         """Stop the timer and return to idle."""
-        self.running = False
+        self._tick_timer.stop()
+        self._idle_timer.stop()
+        self._paused_remaining = None
         self.state = TimerState.IDLE
-        self.time_remaining = 0
+        self._last_title = None
         self.update_title()
-        self.update_menu_state()
+        self._apply_state_wiring()
 
     def wait_for_user(self):
         """Wait for user activity before starting next focus session."""
         self.state = TimerState.WAITING_FOR_USER
         self.update_title()
-        self.update_menu_state()
+        self._apply_state_wiring()
 
         self.notify(
             "Ready to focus? 🍅",
             "Move your mouse or press a key to start the next focus session."
         )
 
-        # Poll for user activity
-        while self.running and self.state == TimerState.WAITING_FOR_USER:
-            idle_time = self.get_idle_time()
-            if idle_time < 3:  # User active in last 3 seconds
-                self.start_focus()
-                return
-            time.sleep(1)
-
-    def timer_loop(self):
-        """Main timer loop running in a separate thread."""
-        while self.running:
-            if self.state in (TimerState.FOCUS, TimerState.SHORT_REST, TimerState.LONG_REST):
-                if self.time_remaining > 0:
-                    time.sleep(1)
-                    self.time_remaining -= 1
-                    self.update_title()
-                else:
-                    # Timer finished
-                    if self.state == TimerState.FOCUS:
-                        self.completed_sessions += 1
-                        self.sessions_today += 1
-                        self.update_menu_state()
-
-                        # Determine if long rest
-                        is_long = self.completed_sessions % self.sessions_until_long_rest == 0
-                        self.start_rest(is_long=is_long)
-
-                    elif self.state in (TimerState.SHORT_REST, TimerState.LONG_REST):
-                        # Rest finished, wait for user
-                        self.wait_for_user()
-
-            elif self.state == TimerState.WAITING_FOR_USER:
-                time.sleep(0.5)
-
-            else:
-                time.sleep(0.5)
+        self._tick_timer.stop()
+        self._idle_timer.stop()
+        self._idle_timer.interval = self._poll_interval = 1
+        self._skip_next_poll = False
+        self._start_timer(self._idle_timer)
+
+    def _set_poll_interval(self, interval):
+        """Reschedule the activity poll at a new interval."""
+        # rumps only applies interval changes reliably while the timer is stopped
+        self._idle_timer.stop()
+        self._idle_timer.interval = self._poll_interval = interval
+        # start() fires once immediately; that callback must not count as a poll
+        self._skip_next_poll = True
+        self._start_timer(self._idle_timer)
+
+    def _poll_idle(self, _):
+        """Start the next focus session once the user is active again."""
+        if self.state != TimerState.WAITING_FOR_USER:
+            self._idle_timer.stop()
+            return
+        if self._skip_next_poll:
+            self._skip_next_poll = False
+            return
+        if NSRunLoop.currentRunLoop().currentMode() == NSEventTrackingRunLoopMode:
+            # The status menu is open, so the user is here; check again once it closes
+            return
+        idle_time = self.get_idle_time()
+        if idle_time < 3:  # User active in last 3 seconds
+            self.start_focus()
+            return
+
+        # Back off while the user is away, poll quickly once they look close
+        if idle_time >= 10:
+            interval = min(10, self._poll_interval * 2)
+        elif idle_time < 5:
+            interval = 1
+        else:
+            interval = self._poll_interval
+        if interval != self._poll_interval:
+            self._set_poll_interval(interval)
+
+    def _on_tick(self, _):
+        """Advance the countdown; called once per second on the main runloop."""
+        remaining = self._deadline - time.monotonic()
+        if remaining > 0:
+            self.update_title(int(math.ceil(remaining)))
+            return
+
+        # Timer finished
+        self._tick_timer.stop()
+        if self.state == TimerState.FOCUS:
+            self.completed_sessions += 1
+            self.sessions_today += 1
+            self._refresh_stats()
+
+            # Determine if long rest
+            is_long = self.completed_sessions % self.sessions_until_long_rest == 0
+            self.start_rest(is_long=is_long)
+
+        elif self.state in (TimerState.SHORT_REST, TimerState.LONG_REST):
+            # Rest finished, wait for user
+            self.wait_for_user()
+
+    def _on_sleep(self):
+        """Pause a running session before the system sleeps."""
+        if self._tick_timer.is_alive():
+            self._paused_remaining = self._deadline - time.monotonic()
+            self._tick_timer.stop()
+
+    def _on_wake(self):
+        """Resume a session paused by _on_sleep."""
+        if self._paused_remaining is not None:
+            # Whole seconds keep the restarted ticks aligned with the deadline
+            self._deadline = time.monotonic() + math.ceil(self._paused_remaining)
+            self._paused_remaining = None
+            self._tick_timer.stop()
+            self._start_timer(self._tick_timer)
 
     def toggle_autostart(self, sender):
         """Toggle auto-start on login."""
@@ -363,7 +493,8 @@ class PomodoroApp(rumps.App):
 
     def quit_app(self, _=None):
         """Quit the application."""
-        self.running = False
+        self._tick_timer.stop()
+        self._idle_timer.stop()
         rumps.quit_application()
 
 
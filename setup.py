@@ -22,10 +22,6 @@ OPTIONS = {
         'NSHumanReadableCopyright': 'MIT License',
     },
     'packages': ['rumps'],
-    'includes': [
-        'Quartz',
-        'Quartz.CoreGraphics',
-    ],
 }
 
 setup(